@@ -27,9 +27,13 @@ from .constants import (
     DEFAULT_GRAPH_WEIGHTED_PATH, DEFAULT_MAPPING_PATH, PUBCHEM_NAMESPACE, UMLS_NAMESPACE, UNIPROT_NAMESPACE,
 )
 from .get_url_requests import cid_to_smiles, cid_to_synonyms
+from .utils import get_first_smiles, write_edgelist
 
 logger = logging.getLogger(__name__)
 
+#: The default Tanimoto distance threshold for clustering chemicals
+DEFAULT_DISTANCE_THRESHOLD = 0.3
+
 
 def get_smiles(pubchem_ids):
     """
@@ -95,11 +99,12 @@ def parse_chemical_mapping(mapping_file, pubchem_ids):
         dtype={'pubchem_id': str, 'smiles': str},
         index_col=False,
     )
+    known_smiles = get_first_smiles(chemicals_mapping)
     pubchem_id_to_smiles = {}
     new_chemicals = []
     smiles = []
     for pubchem_id in tqdm(pubchem_ids, desc="Getting SMILES"):
-        if chemicals_mapping.loc[chemicals_mapping["pubchem_id"] == pubchem_id].empty:
+        if pubchem_id not in known_smiles:
             chemical_smiles = cid_to_smiles(pubchem_id)
             if not isinstance(chemical_smiles, str):
                 chemical_smiles = chemical_smiles.decode("utf-8")
@@ -107,10 +112,7 @@ def parse_chemical_mapping(mapping_file, pubchem_ids):
             new_chemicals.append(pubchem_id)
             smiles.append(chemical_smiles)
         else:
-            pubchem_id_to_smiles[pubchem_id] = chemicals_mapping.loc[
-                chemicals_mapping["pubchem_id"] == pubchem_id,
-                "smiles",
-            ].iloc[0]
+            pubchem_id_to_smiles[pubchem_id] = known_smiles[pubchem_id]
     new_df = pd.DataFrame({"pubchem_id": new_chemicals, "smiles": smiles})
     chemicals_mapping = chemicals_mapping.append(new_df)
     chemicals_mapping.to_csv(mapping_file, sep='\t', index=False)
@@ -125,39 +127,39 @@ def create_clustered_chemsim_graph(
 ):
     """Create clustered chemsim graph."""
     similarities = get_similarity(pubchem_id_to_fingerprint) if weighted else None
-    clustered_df = cluster_chemicals(rebuild=True, chemicals_dict=pubchem_id_to_fingerprint)
-    clusters = clustered_df['Cluster'].unique().tolist()
-    for cluster in tqdm(clusters, desc='Creating similarity BELGraph'):
-        chemicals = clustered_df.loc[clustered_df['Cluster'] == cluster]
-        if len(chemicals) == 1:
+    clustered_df = cluster_chemicals(chemicals_dict=pubchem_id_to_fingerprint)
+    clusters = clustered_df.groupby('Cluster', sort=False)['PubchemID']
+    for _, pubchem_ids in tqdm(clusters, desc='Creating similarity BELGraph'):
+        if len(pubchem_ids) == 1:
             continue
 
-        for _, source_row in chemicals.iterrows():
-            for _, target_row in chemicals.iterrows():
-                source_pubchem_id = source_row['PubchemID']
-                target_pubchem_id = target_row['PubchemID']
-
-                if source_pubchem_id == target_pubchem_id:
-                    continue
+        # build the nodes once per chemical instead of once per pair
+        chemicals = {
+            pubchem_id: pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=pubchem_id)
+            for pubchem_id in pubchem_ids.values
+        }
+        for source_pubchem_id, target_pubchem_id in itt.permutations(pubchem_ids.values, 2):
+            if source_pubchem_id == target_pubchem_id:
+                continue
 
-                source_chemical = pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=source_pubchem_id)
-                target_chemical = pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=target_pubchem_id)
-                if (
-                    chemsim_graph.has_edge(source_chemical, target_chemical)
-                    or chemsim_graph.has_edge(target_chemical, source_chemical)
-                ):
-                    continue
+            source_chemical = chemicals[source_pubchem_id]
+            target_chemical = chemicals[target_pubchem_id]
+            if (
+                chemsim_graph.has_edge(source_chemical, target_chemical)
+                or chemsim_graph.has_edge(target_chemical, source_chemical)
+            ):
+                continue
 
-                chemsim_graph.add_unqualified_edge(source_chemical, target_chemical, 'association')
+            chemsim_graph.add_unqualified_edge(source_chemical, target_chemical, 'association')
 
-                if weighted:
-                    if (source_pubchem_id, target_pubchem_id) in similarities:
-                        similarity = similarities[source_pubchem_id, target_pubchem_id]
-                    else:
-                        similarity = similarities[target_pubchem_id, source_pubchem_id]
+            if weighted:
+                if (source_pubchem_id, target_pubchem_id) in similarities:
+                    similarity = similarities[source_pubchem_id, target_pubchem_id]
+                else:
+                    similarity = similarities[target_pubchem_id, source_pubchem_id]
 
-                    for key in chemsim_graph[source_chemical][target_chemical]:
-                        chemsim_graph[source_chemical][target_chemical][key]['weight'] = similarity
+                for key in chemsim_graph[source_chemical][target_chemical]:
+                    chemsim_graph[source_chemical][target_chemical][key]['weight'] = similarity
 
     return chemsim_graph
 
@@ -213,12 +215,16 @@ def get_similarity_graph(
         )
     else:
         similarities = get_similarity(pubchem_id_to_fingerprint)
+        chemicals = {
+            pubchem_id: pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=pubchem_id)
+            for pubchem_id in pubchem_id_to_fingerprint
+        }
         similarities_it = tqdm(similarities.items(), desc='Creating similarity BELGraph')
         for (source_pubchem_id, target_pubchem_id), similarity in similarities_it:
             if similarity < minimum_similarity:
                 continue
-            source = pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=source_pubchem_id)
-            target = pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=target_pubchem_id)
+            source = chemicals[source_pubchem_id]
+            target = chemicals[target_pubchem_id]
             chemsim_graph.add_unqualified_edge(source, target, 'association')
             if weighted:
                 for key in chemsim_graph[source][target]:
@@ -270,17 +276,22 @@ def get_combined_graph_similarity(
         index_col=False,
     )
 
-    relabel_graph = {}
-    for node_id, namespace, identifier, name in mapping_df[['node_id', 'namespace', 'identifier', 'name']].values:
-        if namespace == PUBCHEM_NAMESPACE:
-            _node = pybel.dsl.Abundance(namespace=namespace, identifier=identifier)
-        elif namespace == UNIPROT_NAMESPACE:
-            _node = pybel.dsl.Protein(namespace=namespace, identifier=identifier, name=name)
-        elif namespace == UMLS_NAMESPACE:
-            _node = pybel.dsl.Pathology(namespace=namespace, identifier=identifier, name=name)
-        else:
+    namespaces = mapping_df['namespace']
+    for namespace in namespaces.unique():
+        if namespace not in {PUBCHEM_NAMESPACE, UNIPROT_NAMESPACE, UMLS_NAMESPACE}:
             raise ValueError(f'Unhandled namespace: {namespace}')
-        relabel_graph[_node] = node_id
+
+    chemicals_df = mapping_df[namespaces == PUBCHEM_NAMESPACE]
+    relabel_graph = {
+        pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=identifier): node_id
+        for identifier, node_id in zip(chemicals_df['identifier'].values, chemicals_df['node_id'].values)
+    }
+    for namespace, dsl in ((UNIPROT_NAMESPACE, pybel.dsl.Protein), (UMLS_NAMESPACE, pybel.dsl.Pathology)):
+        namespace_df = mapping_df[namespaces == namespace]
+        relabel_graph.update(
+            (dsl(namespace=namespace, identifier=identifier, name=name), node_id)
+            for identifier, name, node_id in namespace_df[['identifier', 'name', 'node_id']].values
+        )
 
     nx.relabel_nodes(fullgraph_with_chemsim, relabel_graph, copy=False)
     if new_graph_path is None:
@@ -289,28 +300,41 @@ def get_combined_graph_similarity(
         else:
             new_graph_path = DEFAULT_GRAPH_PATH
 
-    if weighted:
-        nx.write_weighted_edgelist(fullgraph_with_chemsim, new_graph_path)
-    else:
-        nx.write_edgelist(fullgraph_with_chemsim, new_graph_path, data=False)
+    write_edgelist(fullgraph_with_chemsim, new_graph_path, weighted=weighted)
 
     return fullgraph_with_chemsim
 
 
+def _get_clusters_path(distance_threshold: float) -> str:
+    """Get the path of the chemical clusters made at the given distance threshold."""
+    if distance_threshold == DEFAULT_DISTANCE_THRESHOLD:
+        return DEFAULT_CLUSTERED_CHEMICALS
+    root, extension = os.path.splitext(DEFAULT_CLUSTERED_CHEMICALS)
+    return f'{root}_{distance_threshold}{extension}'
+
+
 def cluster_chemicals(
     *,
     rebuild: bool = False,
     chemicals_dict,
-    distance_threshold: float = 0.3,
+    distance_threshold: float = DEFAULT_DISTANCE_THRESHOLD,
 ):
-    """Cluster chemicals based on their similarities."""
-    if not rebuild and os.path.exists(DEFAULT_CLUSTERED_CHEMICALS):
-        return pd.read_csv(
-            DEFAULT_CLUSTERED_CHEMICALS,
+    """Cluster chemicals based on their similarities.
+
+    If not rebuilding, the clusters saved by a previous call with the same distance threshold are reused when they
+    were made for the same chemicals.
+    """
+    clusters_path = _get_clusters_path(distance_threshold)
+    if not rebuild and os.path.exists(clusters_path):
+        clustered_df = pd.read_csv(
+            clusters_path,
             sep="\t",
             index_col=False,
             dtype={'PubchemID': str},
         )
+        if set(clustered_df['PubchemID']) == set(chemicals_dict):
+            return clustered_df
+        logger.info('Rebuilding the chemical clusters since the chemicals changed')
     dists = []
     drugs, fps = zip(*chemicals_dict.items())
 
@@ -319,15 +343,16 @@ def cluster_chemicals(
         sims = DataStructs.BulkTanimotoSimilarity(fps[i], fps[:i])
         dists.extend([1 - x for x in sims])
     cs = Butina.ClusterData(dists, nfps, distance_threshold, isDistData=True)
-    df = pd.DataFrame(columns=['PubchemID', 'Cluster'])
-
-    i = 1
-    for j, cluster in enumerate(cs, start=1):
-        for drug in cluster:
-            df.loc[i] = [drugs[drug - 1]] + [j]
-            i += 1
+    df = pd.DataFrame(
+        [
+            (drugs[drug - 1], j)
+            for j, cluster in enumerate(cs, start=1)
+            for drug in cluster
+        ],
+        columns=['PubchemID', 'Cluster'],
+    )
 
-    df.to_csv(DEFAULT_CLUSTERED_CHEMICALS, sep='\t', index=False)
+    df.to_csv(clusters_path, sep='\t', index=False)
     return df
 
 
@@ -21,6 +21,7 @@ from .constants import (
 )
 from .graph_preprocessing import get_mapped_graph
 from .pipeline import do_evaluation, do_optimization, repeat_experiment, train_model
+from .utils import write_edgelist
 
 INPUT_PATH = click.option(
     '--input-path', default=DEFAULT_GRAPH_PATH,
@@ -64,6 +65,16 @@ CLASSIFIER_TYPE = click.option(
     help='Choose type of classifier for predictive model',
 )
 WEIGHTED = click.option('--weighted', is_flag=True, help='True if graph is weighted.')
+WALK_BACKEND = click.option(
+    '--walk-backend', default='bionev', type=click.Choice(['bionev', 'fastnode2vec']),
+    help='The implementation used to train node2vec and DeepWalk',
+)
+
+
+def _validate_n_jobs(ctx, param, value):
+    if value == 0:
+        raise click.BadParameter('must be a positive number of processes, or -1 to use all CPUs')
+    return value
 
 
 @click.group()
@@ -83,6 +94,14 @@ def main():
 @click.option('--dimensions-range', default=(100, 300), type=(int, int), help='the range of dimensions to be optimized')
 @click.option('--storage', help="SQL connection string for study database. Example: sqlite:///optuna.db")
 @click.option('--name', help="Name for the study")
+@click.option(
+    '--n-jobs', default=1, type=int,
+    help='The number of trials to run in parallel threads. Such trials are not reproducible',
+)
+@click.option(
+    '--n-workers', default=1, type=click.IntRange(min=1),
+    help='The number of processes that run the trials. Needs --storage and --name',
+)
 @click.option('-o', '--output', type=click.File('w'), help="Output study summary", default=sys.stdout)
 @WEIGHTED
 @CLASSIFIER_TYPE
@@ -98,6 +117,8 @@ def optimize(
     dimensions_range,
     storage,
     name,
+    n_jobs,
+    n_workers,
     output,
     classifier_type,
     weighted,
@@ -118,6 +139,8 @@ def optimize(
         classifier_type=classifier_type,
         weighted=weighted,
         study_seed=seed,
+        n_jobs=n_jobs,
+        n_workers=n_workers,
     )
 
 
@@ -147,6 +170,7 @@ def optimize(
 @WEIGHTED
 @PREDICTION_TASK
 @LABELS_FILE
+@WALK_BACKEND
 def train(
     input_path,
     training_path,
@@ -173,6 +197,7 @@ def train(
     weighted,
     prediction_task,
     labels_file,
+    walk_backend,
 ):
     """Train my model."""
     np.random.seed(seed)
@@ -203,6 +228,7 @@ def train(
             weighted=weighted,
             prediction_task=prediction_task,
             labels_file=labels_file,
+            walk_backend=walk_backend,
         )
         click.echo('Training is finished.')
         click.echo(results)
@@ -227,6 +253,7 @@ def train(
             weighted=weighted,
             labels_file=labels_file,
             prediction_task=prediction_task,
+            walk_backend=walk_backend,
         )
         click.echo('Training is finished.')
 
@@ -323,6 +350,10 @@ def update(
 @PREDICTION_TASK
 @CLASSIFIER_TYPE
 @click.option('--randomization', type=click.Choice(['xswap', 'random', 'node_shuffle']))
+@click.option(
+    '--n-jobs', default=1, type=click.IntRange(min=-1), callback=_validate_n_jobs,
+    help='The number of processes to run the repeats in. -1 uses all CPUs',
+)
 def repeat(
     input_path,
     training_path,
@@ -346,6 +377,7 @@ def repeat(
     prediction_task,
     randomization,
     classifier_type,
+    n_jobs,
 ):
     """Repeat training n times."""
     np.random.seed(seed)
@@ -373,6 +405,7 @@ def repeat(
         prediction_task=prediction_task,
         randomization=randomization,
         classifier_type=classifier_type,
+        n_jobs=n_jobs,
     )
     click.echo(results)
 
@@ -486,9 +519,9 @@ def rebuild():
     click.secho('Rebuilding training and testing sets', fg='blue', bold=True)
     # TODO: make a function for this
     _, g_train, g_test_edges, _ = split_train_test_graph(input_graph=fullgraph_with_chemsim)
-    nx.write_edgelist(g_train, DEFAULT_TRAINING_SET)
-    g_test = nx.add_from_edges(g_test_edges)
-    nx.write_edgelist(g_test, DEFAULT_TESTING_SET)
+    write_edgelist(g_train, DEFAULT_TRAINING_SET)
+    g_test = nx.from_edgelist(g_test_edges)
+    write_edgelist(g_test, DEFAULT_TESTING_SET)
     click.echo(nx.info(g_train))
     click.echo(nx.info(g_test))
 
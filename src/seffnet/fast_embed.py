@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""Train random-walk embeddings with :mod:`fastnode2vec`.
+
+:mod:`fastnode2vec` generates the walks with Numba over a CSR adjacency matrix instead of in pure Python,
+which makes walk generation negligible compared to training word2vec. It is an optional dependency that
+can be installed with the ``fast`` extra, which pins the release that works with both gensim 3 (used by BioNEV)
+and gensim 4:
+
+.. code-block:: sh
+
+    $ pip install -e .[fast]
+"""
+
+import os
+from typing import Mapping, Optional
+
+import joblib
+import numpy as np
+from bionev.utils import read_graph
+
+__all__ = [
+    'FastNode2VecModel',
+    'train_embed_fastnode2vec',
+]
+
+
+class FastNode2VecModel:
+    """Wrap trained :mod:`fastnode2vec` embeddings with the interface of the BioNEV models."""
+
+    def __init__(self, vectors: Mapping[str, np.ndarray]):  # noqa: D107
+        self.vectors = dict(vectors)
+
+    def get_embeddings(self) -> Mapping[str, np.ndarray]:
+        """Get the embeddings of the nodes."""
+        return self.vectors
+
+    def save_embeddings(self, filename: str) -> None:
+        """Save the embeddings in the word2vec text format."""
+        dimensions = len(next(iter(self.vectors.values()))) if self.vectors else 0
+        with open(filename, 'w') as file:
+            print(len(self.vectors), dimensions, file=file)
+            for node, vector in self.vectors.items():
+                print(node, ' '.join(str(value) for value in vector), file=file)
+
+    def save_model(self, filename: str) -> None:
+        """Save the model with :mod:`joblib`."""
+        joblib.dump(self, filename)
+
+
+def train_embed_fastnode2vec(
+    *,
+    train_graph_filename: str,
+    method: str = 'node2vec',
+    dimensions: int = 300,
+    number_walks: int = 8,
+    walk_length: int = 8,
+    window_size: int = 4,
+    p: float = 1.5,
+    q: float = 2.1,
+    weighted: bool = False,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> FastNode2VecModel:
+    """Train node2vec or DeepWalk embeddings with :mod:`fastnode2vec`.
+
+    :param train_graph_filename: the path of the training graph edgelist
+    :param method: either 'node2vec' or 'DeepWalk'. DeepWalk is node2vec with p = q = 1.
+    :param dimensions: the dimensions of the embeddings
+    :param number_walks: the number of walks started from each node
+    :param walk_length: the length of each walk
+    :param window_size: the context window size of word2vec
+    :param p: the return parameter of node2vec
+    :param q: the in-out parameter of node2vec
+    :param weighted: true if the edgelist is weighted
+    :param workers: the number of threads used to train word2vec. Defaults to the number of CPUs.
+    :param seed: the seed of the walks. fastnode2vec reseeds every batch of walks with it, so the walks of different
+     batches are correlated. Defaults to unseeded walks.
+    :return: the trained model
+    """
+    try:
+        from fastnode2vec import Graph, Node2Vec
+    except ImportError:
+        raise ImportError('You need to install fastnode2vec to use it as the walk backend')
+
+    if method == 'DeepWalk':
+        p, q = 1.0, 1.0
+    elif method != 'node2vec':
+        raise ValueError(f'fastnode2vec can not train {method}')
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    nx_graph = read_graph(train_graph_filename, weighted=weighted)
+    if weighted:
+        graph = Graph(nx_graph.edges(data='weight'), directed=False, weighted=True)
+    else:
+        graph = Graph(nx_graph.edges(), directed=False, weighted=False)
+
+    kwargs = {}
+    if seed is not None:
+        kwargs['seed'] = seed
+
+    model = Node2Vec(
+        graph,
+        dim=dimensions,
+        walk_length=walk_length,
+        context=window_size,
+        p=p,
+        q=q,
+        workers=workers,
+        **kwargs,
+    )
+    # each epoch starts one walk from every node
+    model.train(epochs=number_walks)
+    # read the nodes from the graph rather than the word2vec vocabulary, whose API differs between gensim 3 and 4
+    return FastNode2VecModel({
+        str(node): model.wv[node]
+        for node in graph.node_names
+    })
@@ -7,8 +7,10 @@ The model and embeddings are trained and created from a graph containing drugs,
 The graph used contained nodeIDs that can be mapped using a tsv file
 """
 
+import logging
+import os
+import tempfile
 from dataclasses import dataclass
-from operator import itemgetter
 from typing import Any, List, Mapping, Optional, Tuple
 
 import joblib
@@ -27,7 +29,9 @@ __all__ = [
 
 NodeInfo = Mapping[str, str]
 Embeddings = Mapping[str, np.ndarray]
-RelationsResults = Tuple[List[NodeInfo], List[np.ndarray], List[bool]]
+RelationsResults = Tuple[List[NodeInfo], np.ndarray, List[bool]]
+
+logger = logging.getLogger(__name__)
 
 
 class MissingCurie(ValueError):
@@ -35,12 +39,38 @@ class MissingCurie(ValueError):
 
 
 def _load_embedding(path: str) -> Embeddings:
-    """Load an embedding then fix its data types."""
+    """Load an embedding then fix its data types.
+
+    The parsed embeddings are cached with :mod:`joblib` next to the text file, together with the modification time
+    and size of the embeddings file, and reused as long as both are unchanged.
+    """
+    cache_path = f'{path}.joblib'
+    stat = os.stat(path)
+    source = stat.st_mtime_ns, stat.st_size
+    if os.path.exists(cache_path):
+        cached = joblib.load(cache_path)
+        if isinstance(cached, tuple) and cached[0] == source:
+            return cached[1]
+
     rv = load_embedding(path)
-    return {
+    embeddings = {
         str(node_id): np.array(node_vector)
         for node_id, node_vector in rv.items()
     }
+    # write to a temporary file first so other processes never load a partially written cache
+    try:
+        fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix='.joblib')
+    except OSError:
+        logger.warning(f'Could not cache embeddings to {cache_path}')
+        return embeddings
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            joblib.dump((source, embeddings), file)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        logger.warning(f'Could not cache embeddings to {cache_path}')
+        os.remove(temporary_path)
+    return embeddings
 
 
 @dataclass
@@ -58,6 +88,16 @@ class Predictor:
     #: The precision at which results are reported
     precision: int = 5
 
+    def __post_init__(self):  # noqa: D105
+        # lay the embeddings out as arrays over all nodes so relations can be found with vectorized operations
+        self._node_ids = np.array(list(self.embeddings), dtype=object)
+        self._embedding_matrix = np.array(list(self.embeddings.values()))
+        node_infos = [self._get_entity_json(node_id) for node_id in self._node_ids]
+        self._node_namespaces = np.array(
+            [node_info['namespace'] if node_info is not None else None for node_info in node_infos],
+            dtype=object,
+        )
+
     @classmethod
     def from_paths(
         cls,
@@ -70,7 +110,13 @@ class Predictor:
     ) -> 'Predictor':
         """Return the predictor for embeddings."""
         model = joblib.load(model_path)
-        mapping = pd.read_csv(mapping_path, sep='\t', dtype={'node_id': str})
+        mapping = pd.read_csv(
+            mapping_path,
+            sep='\t',
+            engine='c',
+            usecols=['node_id', 'namespace', 'identifier', 'name', 'type'],
+            dtype={'node_id': str, 'namespace': 'category', 'identifier': str, 'name': str, 'type': 'category'},
+        )
 
         node_id_to_info = {}
         node_curie_to_id = {}
@@ -227,33 +273,27 @@ class Predictor:
         namespace: Optional[str] = None,
         source_vector: np.ndarray,
     ) -> RelationsResults:
-        node_list, relations_list, relation_novelties = [], [], []
-        for target_id, target_vector in self.embeddings.items():
-            if source_id == target_id:
-                continue
-
-            novel = (
-                self.graph is None or
-                not (self.graph.has_edge(source_id, target_id) or self.graph.has_edge(target_id, source_id))
-            )
-
-            node_info = self._get_entity_json(target_id)
-            if namespace is not None and node_info['namespace'] != namespace:
-                continue
-            node_list.append(node_info)
-            relation_novelties.append(novel)
+        if self.graph is not None and source_id in self.graph:
+            known_neighbors = set(nx.all_neighbors(self.graph, source_id))
+        else:
+            known_neighbors = set()
 
-            # apply that hadamard operator
-            relation = source_vector * target_vector
-            relations_list.append(relation.tolist())
+        mask = self._node_ids != source_id
+        if namespace is not None:
+            mask &= self._node_namespaces == namespace
+        target_ids = self._node_ids[mask]
 
-        return node_list, relations_list, relation_novelties
+        # apply that hadamard operator
+        relations = self._embedding_matrix[mask] * source_vector
+        node_list = [self._get_entity_json(target_id) for target_id in target_ids]
+        relation_novelties = [target_id not in known_neighbors for target_id in target_ids]
+        return node_list, relations, relation_novelties
 
     def get_probabilities(
         self,
         *,
         nodes,
-        relations: List[np.ndarray],
+        relations: np.ndarray,
         relation_novelties: List[bool],
         k: Optional[int] = None,
     ) -> List[Mapping[str, Any]]:
@@ -263,25 +303,23 @@ class Predictor:
         Also sort the found probabilities by highest to lowest, then return the k highest probabilities.
 
         :param nodes: the list of the nodes with relations to the entity
-        :param relations: the list of edge embedding of the two nodes
+        :param relations: the edge embeddings of the two nodes, one row per relation
         :param k: the number of relations to be output
         :return: the k first probabilities in the list, type= list of tuples
         """
-        probabilities = self._predict_helper(relations)
-        results = [
+        lors = np.round(self._predict_helper(relations), self.precision)
+        # sort and filter the indices of the relations, so only the returned results need to be built
+        indices = np.argsort(lors, kind='stable')
+        if not self.positive_control:
+            indices = indices[np.asarray(relation_novelties, dtype=bool)[indices]]
+        if k is not None:
+            indices = indices[:k]
+
+        return [
             {
-                'lor': round(lor, self.precision),
-                'novel': novel,
-                **node,
+                'lor': lors[index],
+                'novel': relation_novelties[index],
+                **nodes[index],
             }
-            for node, lor, novel in zip(nodes, probabilities, relation_novelties)
+            for index in indices
         ]
-        results = sorted(results, key=itemgetter('lor'))
-        if not self.positive_control:
-            # results = [result for result in results if result['novel']]
-            results = list(filter(itemgetter('novel'), results))
-
-        if k is not None:
-            return results[:k]
-        else:
-            return results
@@ -3,6 +3,7 @@
 """Pre-processing of Graphs used for NRL models."""
 
 import os
+from itertools import chain
 from typing import Union
 
 import networkx as nx
@@ -23,6 +24,7 @@ from .constants import (
     UNIPROT_NAMESPACE,
 )
 from .get_url_requests import cid_to_inchikey, cid_to_smiles, cid_to_synonyms, get_gene_names, inchikey_to_cid
+from .utils import get_first_smiles, write_edgelist
 
 
 def get_sider_graph(rebuild: bool = False, weighted: bool = False) -> pybel.BELGraph:
@@ -45,11 +47,13 @@ def get_sider_graph(rebuild: bool = False, weighted: bool = False) -> pybel.BELG
         return sider_graph
 
     frequency_df = bio2bel_sider.parser.get_se_frequency_df()
-    frequency_dict = {}
-    for stitch_flat, _, umls, _, _, freq_lb, freq_up, _, _, _ in frequency_df.values:
-        pubchem_id = str(abs(int(stitch_flat[3:])) - 100000000)
-        freq = (freq_lb + freq_up) / 2
-        frequency_dict[pubchem_id, umls] = freq
+    # columns are: STITCH flat, STITCH stereo, UMLS, placebo, frequency, lower bound, upper bound, ...
+    pubchem_ids = (frequency_df.iloc[:, 0].str[3:].astype(int).abs() - 100000000).astype(str)
+    frequencies = (frequency_df.iloc[:, 5] + frequency_df.iloc[:, 6]) / 2
+    frequency_dict = dict(zip(
+        zip(pubchem_ids.values, frequency_df.iloc[:, 2].values),
+        frequencies.values,
+    ))
 
     keys, frequencies = zip(*frequency_dict.items())
 
@@ -130,18 +134,12 @@ def get_weighted_drugbank_graph(
         index_col=False,
         dtype={'chemical_pubchem_id': str},
     )
-    edge_weights = {
-        (chemical_pubchem, target_uniprot): normalized_pchembl
-        for chemical_pubchem, _, target_uniprot, _, _, normalized_pchembl in potency_mapping.values
-    }
-    for source, target in drugbank_graph.edges():
-        for key in drugbank_graph[source][target]:
-            t = str(source.identifier), str(target.identifier)
-            if t in edge_weights:
-                weight = edge_weights[t]
-            else:
-                weight = 0.0
-            drugbank_graph[source][target][key]['weight'] = weight
+    edge_weights = dict(zip(
+        zip(potency_mapping['chemical_pubchem_id'].values, potency_mapping['target_uniprot_id'].values),
+        potency_mapping['normalize_pchembl'].values,
+    ))
+    for source, target, edge_data in drugbank_graph.edges(data=True):
+        edge_data['weight'] = edge_weights.get((str(source.identifier), str(target.identifier)), 0.0)
 
     return drugbank_graph
 
@@ -180,7 +178,7 @@ def get_combined_sider_drugbank(
     else:
         drugbank_graph = get_drugbank_graph(rebuild=rebuild, weighted=weighted, drug_namespace=PUBCHEM_NAMESPACE)
 
-    smiles_dict = {}
+    pubchem_id_to_smiles = {}
     if chemical_mapping is not None:
         mapping_df = pd.read_csv(
             chemical_mapping,
@@ -188,25 +186,14 @@ def get_combined_sider_drugbank(
             dtype={'pubchem_id': str, 'smiles': str},
             index_col=False,
         )
-    else:
-        mapping_df = None
-    for node in tqdm(sider_graph.nodes(), desc='get sider chemicals smiles'):
-        if node.namespace != PUBCHEM_NAMESPACE:
-            continue
-        if node.identifier in mapping_df.values:
-            smiles = mapping_df.loc[mapping_df['pubchem_id'] == node.identifier, 'smiles'].iloc[0]
-        else:
-            smiles = cid_to_smiles(node.identifier)
-            if not isinstance(smiles, str):
-                smiles = smiles.decode("utf-8")
-        smiles_dict[node] = smiles
-    for node in tqdm(drugbank_graph.nodes(), desc='get drugbank chemicals smiles'):
-        if node.namespace != PUBCHEM_NAMESPACE:
-            continue
-        if node in smiles_dict.keys():
+        pubchem_id_to_smiles = get_first_smiles(mapping_df)
+
+    smiles_dict = {}
+    for node in tqdm(chain(sider_graph, drugbank_graph), desc='get chemicals smiles'):
+        if node.namespace != PUBCHEM_NAMESPACE or node in smiles_dict:
             continue
-        if node.identifier in mapping_df.values:
-            smiles = mapping_df.loc[mapping_df['pubchem_id'] == node.identifier, 'smiles'].iloc[0]
+        if node.identifier in pubchem_id_to_smiles:
+            smiles = pubchem_id_to_smiles[node.identifier]
         else:
             smiles = cid_to_smiles(node.identifier)
             if not isinstance(smiles, str):
@@ -278,24 +265,24 @@ def get_mapped_graph(
                     drug_group=drug_group,
                 )
 
-    relabel_graph = {}
-    i = 1
-    for node in tqdm(graph.nodes(), desc='Relabel graph nodes'):
-        relabel_graph[node] = i
-        i += 1
+    relabel_graph = {
+        node: node_id
+        for node_id, node in enumerate(graph, start=1)
+    }
     node_mapping_list = []
     for node, node_id in tqdm(relabel_graph.items(), desc='Create mapping dataframe'):
         name = node.name
         if node.namespace == PUBCHEM_NAMESPACE:
-            if node.identifier not in chemicals_info.keys():
+            chemical_info = chemicals_info.get(node.identifier)
+            if chemical_info is None:
                 synonyms = cid_to_synonyms(node.identifier)
                 if not isinstance(synonyms, str):
                     synonyms = synonyms.decode("utf-8")
                 name = synonyms.split('\n')[0]
                 entity_type = 'chemical'
             else:
-                name = chemicals_info[node.identifier]['name']
-                entity_type = chemicals_info[node.identifier]['drug_group'] + ' drug'
+                name = chemical_info['name']
+                entity_type = chemical_info['drug_group'] + ' drug'
         elif node.namespace == UNIPROT_NAMESPACE:
             entity_type = 'target'
         else:
@@ -307,10 +294,7 @@ def get_mapped_graph(
     )
     node_mapping_df.to_csv(mapping_path, index=False, sep='\t')
     graph_id = nx.relabel_nodes(graph, relabel_graph)
-    if weighted:
-        nx.write_weighted_edgelist(graph_id, edgelist_path)
-    else:
-        nx.write_edgelist(graph_id, edgelist_path, data=False)
+    write_edgelist(graph_id, edgelist_path, weighted=weighted)
     return graph_id
 
 
@@ -3,7 +3,9 @@
 """Hyperparameter optimization for NRL models."""
 
 import datetime
+import multiprocessing
 import random
+from functools import partial
 from getpass import getuser
 from typing import Optional, Union
 
@@ -23,6 +25,8 @@ def run_study(
     study_seed,
     storage: Union[None, str, BaseStorage] = None,
     study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ) -> Study:
     """Run study for models.
 
@@ -31,8 +35,22 @@ def run_study(
     :param study_seed: The seed used to create the graph
     :param storage: the database that stores the studies and trials
     :param study_name: the name of the study
+    :param n_jobs: the number of trials to run in parallel threads. Since training the models is CPU-bound, the
+     threads are mostly limited by the GIL, so use ``n_workers`` to run trials in parallel processes instead. Trials
+     run in threads are not reproducible, since each trial reseeds the process-wide :mod:`random` and
+     :mod:`numpy.random` states while the others are running, so their ``inner_seed`` can't recreate them.
+    :param n_workers: the number of processes that run the trials. Since the objectives are CPU-bound, this scales
+     better than ``n_jobs``, which uses threads. The extra workers are spawned like the processes of
+     :func:`seffnet.pipeline.repeat_experiment`, so the objective must be picklable, and they load the study from
+     the storage, so it must be given as a database URL together with the study name. Note that the startup
+     trials of the sampler are shared by all workers, so TPE gets slightly less sample-efficient.
     :return: returns the study
     """
+    if n_workers < 1:
+        raise ValueError(f'The number of workers must be at least 1, not {n_workers}')
+    if n_workers != 1 and (not isinstance(storage, str) or study_name is None):
+        raise ValueError('Running several workers needs the storage as a database URL and a study name')
+
     study = optuna.create_study(
         study_name=study_name,
         storage=storage,
@@ -42,10 +60,48 @@ def run_study(
     study.set_user_attr('Author', getuser())
     study.set_user_attr('Date', datetime.datetime.now().strftime("%Y-%m-%d %H:%M"))
     study.set_user_attr('Seed', study_seed)
-    study.optimize(objective, n_trials=n_trials)
+    if n_workers == 1:
+        study.optimize(objective, n_trials=n_trials, n_jobs=n_jobs)
+        return study
+
+    worker_trials, extra_trials = divmod(n_trials, n_workers)
+    # spawn rather than fork like the repeats, so the workers don't inherit the threads of numpy or tensorflow
+    context = multiprocessing.get_context('spawn')
+    workers = [
+        context.Process(
+            target=_optimize_worker,
+            kwargs=dict(
+                objective=objective,
+                storage=storage,
+                study_name=study_name,
+                n_trials=worker_trials + (i < extra_trials),
+                n_jobs=n_jobs,
+                seed=random.randrange(2 ** 32),
+            ),
+        )
+        for i in range(1, n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    study.optimize(objective, n_trials=worker_trials + (0 < extra_trials), n_jobs=n_jobs)
+    for worker in workers:
+        worker.join()
+
+    failed_workers = sum(worker.exitcode != 0 for worker in workers)
+    if failed_workers:
+        raise RuntimeError(f'{failed_workers} of the optimization workers failed')
     return study
 
 
+def _optimize_worker(*, objective, storage: str, study_name: str, n_trials: int, n_jobs: int, seed: int):
+    """Load the study in a worker process and run trials on it."""
+    # seed the worker from the random state of its parent, so that the study seed still determines its trials
+    np.random.seed(seed)
+    random.seed(seed)
+    study = optuna.load_study(study_name=study_name, storage=storage)
+    study.optimize(objective, n_trials=n_trials, n_jobs=n_jobs)
+
+
 def predict_and_evaluate(
     *,
     prediction_task,
@@ -105,6 +161,52 @@ def predict_and_evaluate(
         return round(mcc, 3)
 
 
+def _hope_objective(
+    trial: Trial,
+    *,
+    graph,
+    graph_train,
+    testing_pos_edges,
+    train_graph_filename,
+    seed,
+    dimensions_range,
+    prediction_task,
+    node_list,
+    labels,
+    classifier_type,
+    weighted,
+) -> float:
+    trial.set_user_attr('method', 'hope')
+    classifier = classifier_type
+    if classifier is None:
+        classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
+    else:
+        trial.set_user_attr('classifier', classifier)
+
+    dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
+
+    # Set the inner trial seed
+    _set_trial_seed(trial)
+
+    model = embed_train.train_embed_hope(
+        train_graph_filename=train_graph_filename,
+        dimensions=dimensions,
+        weighted=weighted,
+    )
+    return predict_and_evaluate(
+        model=model,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        seed=seed,
+        trial=trial,
+        labels=labels,
+        node_list=node_list,
+        classifier_type=classifier,
+        prediction_task=prediction_task,
+    )
+
+
 def hope_optimization(
     *,
     graph,
@@ -121,6 +223,8 @@ def hope_optimization(
     classifier_type: Optional[str] = None,
     study_name: Optional[str] = None,
     weighted: bool = False,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ) -> Study:  # noqa: D202
     """Optimize HOPE method.
 
@@ -133,41 +237,86 @@ def hope_optimization(
     :param dimensions_range: the range for dimension parameter
     :param storage: the database that stores the studies and trials
     :param study_name: the name of the study
+    :param n_jobs: the number of trials to run in parallel threads. These trials are not reproducible.
+    :param n_workers: the number of processes that run the trials
     :return: the study
     """
 
-    def objective(trial: Trial) -> float:
-        trial.set_user_attr('method', 'hope')
-        classifier = classifier_type
-        if classifier is None:
-            classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
-        else:
-            trial.set_user_attr('classifier', classifier)
-
-        dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
+    objective = partial(
+        _hope_objective,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        train_graph_filename=train_graph_filename,
+        seed=seed,
+        dimensions_range=dimensions_range,
+        prediction_task=prediction_task,
+        node_list=node_list,
+        labels=labels,
+        classifier_type=classifier_type,
+        weighted=weighted,
+    )
 
-        # Set the inner trial seed
-        _set_trial_seed(trial)
+    return run_study(
+        objective,
+        trial_number,
+        study_seed=seed,
+        storage=storage,
+        study_name=study_name,
+        n_jobs=n_jobs,
+        n_workers=n_workers,
+    )
 
-        model = embed_train.train_embed_hope(
-            train_graph_filename=train_graph_filename,
-            dimensions=dimensions,
-            weighted=weighted,
-        )
-        return predict_and_evaluate(
-            model=model,
-            graph=graph,
-            graph_train=graph_train,
-            testing_pos_edges=testing_pos_edges,
-            seed=seed,
-            trial=trial,
-            labels=labels,
-            node_list=node_list,
-            classifier_type=classifier,
-            prediction_task=prediction_task,
-        )
 
-    return run_study(objective, trial_number, study_seed=seed, storage=storage, study_name=study_name)
+def _deepwalk_objective(
+    trial: Trial,
+    *,
+    graph,
+    graph_train,
+    testing_pos_edges,
+    train_graph_filename,
+    study_seed,
+    dimensions_range,
+    prediction_task,
+    node_list,
+    labels,
+    classifier_type,
+    weighted,
+) -> float:
+    trial.set_user_attr('method', 'deepwalk')
+    classifier = classifier_type
+    if classifier is None:
+        classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
+    else:
+        trial.set_user_attr('classifier', classifier)
+    dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
+    walk_length = trial.suggest_categorical('walk_length', [8, 16, 32, 64, 128])
+    number_walks = trial.suggest_categorical('number_walks', [8, 16, 32, 64, 128, 256])
+    window_size = trial.suggest_int('window_size', 2, 6)
+
+    # Set the inner trial seed
+    _set_trial_seed(trial)
+
+    model = embed_train.train_embed_deepwalk(
+        train_graph_filename=train_graph_filename,
+        dimensions=dimensions,
+        walk_length=walk_length,
+        number_walks=number_walks,
+        window_size=window_size,
+        weighted=weighted,
+    )
+    return predict_and_evaluate(
+        prediction_task=prediction_task,
+        model=model,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        seed=study_seed,
+        trial=trial,
+        labels=labels,
+        node_list=node_list,
+        classifier_type=classifier,
+    )
 
 
 def deepwalk_optimization(
@@ -186,6 +335,8 @@ def deepwalk_optimization(
     classifier_type,
     study_name: Optional[str] = None,
     weighted: bool = False,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ) -> Study:  # noqa: D202
     """Optimize DeepWalk method.
 
@@ -198,46 +349,90 @@ def deepwalk_optimization(
     :param dimensions_range: the range for dimension parameter
     :param storage: the database that stores the studies and trials
     :param study_name: the name of the study
+    :param n_jobs: the number of trials to run in parallel threads. These trials are not reproducible.
+    :param n_workers: the number of processes that run the trials
     :return: the study
     """
 
-    def objective(trial: Trial) -> float:
-        trial.set_user_attr('method', 'deepwalk')
-        classifier = classifier_type
-        if classifier is None:
-            classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
-        else:
-            trial.set_user_attr('classifier', classifier)
-        dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
-        walk_length = trial.suggest_categorical('walk_length', [8, 16, 32, 64, 128])
-        number_walks = trial.suggest_categorical('number_walks', [8, 16, 32, 64, 128, 256])
-        window_size = trial.suggest_int('window_size', 2, 6)
-
-        # Set the inner trial seed
-        _set_trial_seed(trial)
-
-        model = embed_train.train_embed_deepwalk(
-            train_graph_filename=train_graph_filename,
-            dimensions=dimensions,
-            walk_length=walk_length,
-            number_walks=number_walks,
-            window_size=window_size,
-            weighted=weighted,
-        )
-        return predict_and_evaluate(
-            prediction_task=prediction_task,
-            model=model,
-            graph=graph,
-            graph_train=graph_train,
-            testing_pos_edges=testing_pos_edges,
-            seed=study_seed,
-            trial=trial,
-            labels=labels,
-            node_list=node_list,
-            classifier_type=classifier,
-        )
+    objective = partial(
+        _deepwalk_objective,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        train_graph_filename=train_graph_filename,
+        study_seed=study_seed,
+        dimensions_range=dimensions_range,
+        prediction_task=prediction_task,
+        node_list=node_list,
+        labels=labels,
+        classifier_type=classifier_type,
+        weighted=weighted,
+    )
 
-    return run_study(objective, trial_number, study_seed=study_seed, storage=storage, study_name=study_name)
+    return run_study(
+        objective,
+        trial_number,
+        study_seed=study_seed,
+        storage=storage,
+        study_name=study_name,
+        n_jobs=n_jobs,
+        n_workers=n_workers,
+    )
+
+
+def _node2vec_objective(
+    trial: Trial,
+    *,
+    graph,
+    graph_train,
+    testing_pos_edges,
+    train_graph_filename,
+    study_seed,
+    dimensions_range,
+    prediction_task,
+    node_list,
+    labels,
+    classifier_type,
+    weighted,
+) -> float:
+    trial.set_user_attr('method', 'node2vec')
+    classifier = classifier_type
+    if classifier is None:
+        classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
+    else:
+        trial.set_user_attr('classifier', classifier)
+
+    dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
+    walk_length = trial.suggest_categorical('walk_length', [8, 16, 32, 64, 128])
+    number_walks = trial.suggest_categorical('number_walks', [8, 16, 32, 64, 128, 256])
+    window_size = trial.suggest_int('window_size', 2, 6)
+    p = trial.suggest_uniform('p', 0, 4.0)
+    q = trial.suggest_uniform('q', 0, 4.0)
+
+    # Set the inner trial seed
+    _set_trial_seed(trial)
+    model = embed_train.train_embed_node2vec(
+        train_graph_filename=train_graph_filename,
+        dimensions=dimensions,
+        walk_length=walk_length,
+        number_walks=number_walks,
+        window_size=window_size,
+        p=p,
+        q=q,
+        weighted=weighted,
+    )
+    return predict_and_evaluate(
+        prediction_task=prediction_task,
+        model=model,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        seed=study_seed,
+        trial=trial,
+        labels=labels,
+        node_list=node_list,
+        classifier_type=classifier,
+    )
 
 
 def node2vec_optimization(
@@ -256,6 +451,8 @@ def node2vec_optimization(
     classifier_type,
     weighted=False,
     study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ) -> Study:  # noqa: D202
     """Optimize node2vec method.
 
@@ -268,50 +465,84 @@ def node2vec_optimization(
     :param dimensions_range: the range for dimension parameter
     :param storage: the database that stores the studies and trials
     :param study_name: the name of the study
+    :param n_jobs: the number of trials to run in parallel threads. These trials are not reproducible.
+    :param n_workers: the number of processes that run the trials
     :return: the study
     """
 
-    def objective(trial: Trial) -> float:
-        trial.set_user_attr('method', 'node2vec')
-        classifier = classifier_type
-        if classifier is None:
-            classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
-        else:
-            trial.set_user_attr('classifier', classifier)
-
-        dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
-        walk_length = trial.suggest_categorical('walk_length', [8, 16, 32, 64, 128])
-        number_walks = trial.suggest_categorical('number_walks', [8, 16, 32, 64, 128, 256])
-        window_size = trial.suggest_int('window_size', 2, 6)
-        p = trial.suggest_uniform('p', 0, 4.0)
-        q = trial.suggest_uniform('q', 0, 4.0)
-
-        # Set the inner trial seed
-        _set_trial_seed(trial)
-        model = embed_train.train_embed_node2vec(
-            train_graph_filename=train_graph_filename,
-            dimensions=dimensions,
-            walk_length=walk_length,
-            number_walks=number_walks,
-            window_size=window_size,
-            p=p,
-            q=q,
-            weighted=weighted,
-        )
-        return predict_and_evaluate(
-            prediction_task=prediction_task,
-            model=model,
-            graph=graph,
-            graph_train=graph_train,
-            testing_pos_edges=testing_pos_edges,
-            seed=study_seed,
-            trial=trial,
-            labels=labels,
-            node_list=node_list,
-            classifier_type=classifier,
-        )
+    objective = partial(
+        _node2vec_objective,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        train_graph_filename=train_graph_filename,
+        study_seed=study_seed,
+        dimensions_range=dimensions_range,
+        prediction_task=prediction_task,
+        node_list=node_list,
+        labels=labels,
+        classifier_type=classifier_type,
+        weighted=weighted,
+    )
 
-    return run_study(objective, trial_number, study_seed=study_seed, storage=storage, study_name=study_name)
+    return run_study(
+        objective,
+        trial_number,
+        study_seed=study_seed,
+        storage=storage,
+        study_name=study_name,
+        n_jobs=n_jobs,
+        n_workers=n_workers,
+    )
+
+
+def _sdne_objective(
+    trial: Trial,
+    *,
+    graph,
+    graph_train,
+    testing_pos_edges,
+    train_graph_filename,
+    study_seed,
+    prediction_task,
+    node_list,
+    labels,
+    classifier_type,
+    weighted,
+) -> float:
+    trial.set_user_attr('method', 'sdne')
+    classifier = classifier_type
+    if classifier is None:
+        classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
+    else:
+        trial.set_user_attr('classifier', classifier)
+
+    alpha = trial.suggest_uniform('alpha', 0, 0.4)
+    beta = trial.suggest_int('beta', 0, 30)
+    epochs = trial.suggest_categorical('epochs', [5, 10, 15, 20, 25, 30])
+
+    # Set the inner trial seed
+    _set_trial_seed(trial)
+
+    model = embed_train.train_embed_sdne(
+        train_graph_filename=train_graph_filename,
+        alpha=alpha,
+        beta=beta,
+        epochs=epochs,
+        weighted=weighted,
+    )
+    return predict_and_evaluate(
+        prediction_task=prediction_task,
+        model=model,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        seed=study_seed,
+        trial=trial,
+        labels=labels,
+        node_list=node_list,
+        classifier_type=classifier,
+    )
 
 
 def sdne_optimization(
@@ -329,6 +560,8 @@ def sdne_optimization(
     classifier_type,
     weighted=False,
     study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ) -> Study:  # noqa: D202
     """Optimize SDNE method.
 
@@ -341,45 +574,84 @@ def sdne_optimization(
     :param dimensions_range: the range for dimension parameter
     :param storage: the database that stores the studies and trials
     :param study_name: the name of the study
+    :param n_jobs: the number of trials to run in parallel threads. These trials are not reproducible.
+    :param n_workers: the number of processes that run the trials
     :return: the study
     """
 
-    def objective(trial: Trial) -> float:
-        trial.set_user_attr('method', 'sdne')
-        classifier = classifier_type
-        if classifier is None:
-            classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
-        else:
-            trial.set_user_attr('classifier', classifier)
-
-        alpha = trial.suggest_uniform('alpha', 0, 0.4)
-        beta = trial.suggest_int('beta', 0, 30)
-        epochs = trial.suggest_categorical('epochs', [5, 10, 15, 20, 25, 30])
-
-        # Set the inner trial seed
-        _set_trial_seed(trial)
-
-        model = embed_train.train_embed_sdne(
-            train_graph_filename=train_graph_filename,
-            alpha=alpha,
-            beta=beta,
-            epochs=epochs,
-            weighted=weighted,
-        )
-        return predict_and_evaluate(
-            prediction_task=prediction_task,
-            model=model,
-            graph=graph,
-            graph_train=graph_train,
-            testing_pos_edges=testing_pos_edges,
-            seed=study_seed,
-            trial=trial,
-            labels=labels,
-            node_list=node_list,
-            classifier_type=classifier,
-        )
+    objective = partial(
+        _sdne_objective,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        train_graph_filename=train_graph_filename,
+        study_seed=study_seed,
+        prediction_task=prediction_task,
+        node_list=node_list,
+        labels=labels,
+        classifier_type=classifier_type,
+        weighted=weighted,
+    )
 
-    return run_study(objective, trial_number, study_seed=study_seed, storage=storage, study_name=study_name)
+    return run_study(
+        objective,
+        trial_number,
+        study_seed=study_seed,
+        storage=storage,
+        study_name=study_name,
+        n_jobs=n_jobs,
+        n_workers=n_workers,
+    )
+
+
+def _grarep_objective(
+    trial: Trial,
+    *,
+    graph,
+    graph_train,
+    testing_pos_edges,
+    train_graph_filename,
+    study_seed,
+    dimensions_range,
+    prediction_task,
+    node_list,
+    labels,
+    classifier_type,
+    weighted,
+) -> float:
+    trial.set_user_attr('method', 'grarep')
+    classifier = classifier_type
+    if classifier is None:
+        classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
+    else:
+        trial.set_user_attr('classifier', classifier)
+    # TODO: need to choose kstep in which it can divide the dimension
+    dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
+    kstep = trial.suggest_int('kstep', 1, 7)
+    if dimensions % kstep != 0:
+        raise optuna.structs.TrialPruned()
+
+    # Set the inner trial seed
+    _set_trial_seed(trial)
+
+    model = embed_train.train_embed_grarep(
+        train_graph_filename=train_graph_filename,
+        dimensions=dimensions,
+        kstep=kstep,
+        weighted=weighted,
+    )
+    return predict_and_evaluate(
+        prediction_task=prediction_task,
+        model=model,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        seed=study_seed,
+        trial=trial,
+        labels=labels,
+        node_list=node_list,
+        classifier_type=classifier,
+    )
 
 
 def grarep_optimization(
@@ -398,6 +670,8 @@ def grarep_optimization(
     classifier_type,
     weighted=False,
     study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ) -> Study:  # noqa: D202
     """Optimize GraRep method.
 
@@ -410,45 +684,85 @@ def grarep_optimization(
     :param dimensions_range: the range for dimension parameter
     :param storage: the database that stores the studies and trials
     :param study_name: the name of the study
+    :param n_jobs: the number of trials to run in parallel threads. These trials are not reproducible.
+    :param n_workers: the number of processes that run the trials
     :return: the study
     """
 
-    def objective(trial: Trial) -> float:
-        trial.set_user_attr('method', 'grarep')
-        classifier = classifier_type
-        if classifier is None:
-            classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
-        else:
-            trial.set_user_attr('classifier', classifier)
-        # TODO: need to choose kstep in which it can divide the dimension
-        dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
-        kstep = trial.suggest_int('kstep', 1, 7)
-        if dimensions % kstep != 0:
-            raise optuna.structs.TrialPruned()
-
-        # Set the inner trial seed
-        _set_trial_seed(trial)
-
-        model = embed_train.train_embed_grarep(
-            train_graph_filename=train_graph_filename,
-            dimensions=dimensions,
-            kstep=kstep,
-            weighted=weighted,
-        )
-        return predict_and_evaluate(
-            prediction_task=prediction_task,
-            model=model,
-            graph=graph,
-            graph_train=graph_train,
-            testing_pos_edges=testing_pos_edges,
-            seed=study_seed,
-            trial=trial,
-            labels=labels,
-            node_list=node_list,
-            classifier_type=classifier,
-        )
+    objective = partial(
+        _grarep_objective,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        train_graph_filename=train_graph_filename,
+        study_seed=study_seed,
+        dimensions_range=dimensions_range,
+        prediction_task=prediction_task,
+        node_list=node_list,
+        labels=labels,
+        classifier_type=classifier_type,
+        weighted=weighted,
+    )
+
+    return run_study(
+        objective,
+        trial_number,
+        study_seed=study_seed,
+        storage=storage,
+        study_name=study_name,
+        n_jobs=n_jobs,
+        n_workers=n_workers,
+    )
+
+
+def _line_objective(
+    trial: Trial,
+    *,
+    graph,
+    graph_train,
+    testing_pos_edges,
+    train_graph_filename,
+    study_seed,
+    dimensions_range,
+    prediction_task,
+    node_list,
+    labels,
+    classifier_type,
+    weighted,
+) -> float:
+    trial.set_user_attr('method', 'line')
+    classifier = classifier_type
+    if classifier is None:
+        classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
+    else:
+        trial.set_user_attr('classifier', classifier)
+
+    dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
+    order = trial.suggest_categorical('order', [1, 2, 3])
+    epochs = trial.suggest_categorical('epochs', [5, 10, 15, 20, 25, 30])
+
+    # Set the inner trial seed
+    _set_trial_seed(trial)
 
-    return run_study(objective, trial_number, study_seed=study_seed, storage=storage, study_name=study_name)
+    model = embed_train.train_embed_line(
+        train_graph_filename=train_graph_filename,
+        dimensions=dimensions,
+        order=order,
+        epochs=epochs,
+        weighted=weighted,
+    )
+    return predict_and_evaluate(
+        prediction_task=prediction_task,
+        model=model,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        seed=study_seed,
+        trial=trial,
+        labels=labels,
+        node_list=node_list,
+        classifier_type=classifier,
+    )
 
 
 def line_optimization(
@@ -467,6 +781,8 @@ def line_optimization(
     classifier_type,
     weighted=False,
     study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ) -> Study:  # noqa: D202
     """Optimize LINE method.
 
@@ -479,45 +795,35 @@ def line_optimization(
     :param dimensions_range: the range for dimension parameter
     :param storage: the database that stores the studies and trials
     :param study_name: the name of the study
+    :param n_jobs: the number of trials to run in parallel threads. These trials are not reproducible.
+    :param n_workers: the number of processes that run the trials
     :return: the study
     """
 
-    def objective(trial: Trial) -> float:
-        trial.set_user_attr('method', 'line')
-        classifier = classifier_type
-        if classifier is None:
-            classifier = trial.suggest_categorical('classifier', ['SVM', 'EN', 'RF', 'LR'])
-        else:
-            trial.set_user_attr('classifier', classifier)
-
-        dimensions = trial.suggest_int('dimensions', dimensions_range[0], dimensions_range[1])
-        order = trial.suggest_categorical('order', [1, 2, 3])
-        epochs = trial.suggest_categorical('epochs', [5, 10, 15, 20, 25, 30])
-
-        # Set the inner trial seed
-        _set_trial_seed(trial)
-
-        model = embed_train.train_embed_line(
-            train_graph_filename=train_graph_filename,
-            dimensions=dimensions,
-            order=order,
-            epochs=epochs,
-            weighted=weighted,
-        )
-        return predict_and_evaluate(
-            prediction_task=prediction_task,
-            model=model,
-            graph=graph,
-            graph_train=graph_train,
-            testing_pos_edges=testing_pos_edges,
-            seed=study_seed,
-            trial=trial,
-            labels=labels,
-            node_list=node_list,
-            classifier_type=classifier,
-        )
+    objective = partial(
+        _line_objective,
+        graph=graph,
+        graph_train=graph_train,
+        testing_pos_edges=testing_pos_edges,
+        train_graph_filename=train_graph_filename,
+        study_seed=study_seed,
+        dimensions_range=dimensions_range,
+        prediction_task=prediction_task,
+        node_list=node_list,
+        labels=labels,
+        classifier_type=classifier_type,
+        weighted=weighted,
+    )
 
-    return run_study(objective, trial_number, study_seed=study_seed, storage=storage, study_name=study_name)
+    return run_study(
+        objective,
+        trial_number,
+        study_seed=study_seed,
+        storage=storage,
+        study_name=study_name,
+        n_jobs=n_jobs,
+        n_workers=n_workers,
+    )
 
 
 def _set_trial_seed(trial: Trial) -> int:
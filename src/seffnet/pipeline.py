@@ -5,7 +5,11 @@
 import datetime
 import getpass
 import json
+import multiprocessing
+import os
 import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Optional
 
 import networkx as nx
@@ -15,11 +19,68 @@ from bionev.pipeline import create_prediction_model, do_link_prediction, do_node
 from bionev.utils import read_graph, read_node_labels, split_train_test_graph
 from tqdm import tqdm
 
+from .fast_embed import train_embed_fastnode2vec
 from .optimization import (
     deepwalk_optimization, grarep_optimization, hope_optimization, line_optimization,
     node2vec_optimization, sdne_optimization,
 )
-from .utils import create_graphs, study_to_json
+from .utils import create_graphs, study_to_json, write_edgelist
+
+
+#: The methods that can be trained with :mod:`fastnode2vec`
+FASTNODE2VEC_METHODS = {'node2vec', 'DeepWalk'}
+
+#: The arguments of the repeated functions that are paths to files
+PATH_KEYS = {'input_path', 'training_path', 'testing_path'}
+
+
+def _train_embedding(
+    *,
+    walk_backend: str,
+    train_graph_filename,
+    method,
+    dimensions: int,
+    number_walks: int,
+    walk_length: int,
+    window_size: int,
+    p: float,
+    q: float,
+    alpha: float,
+    beta: float,
+    epochs: int,
+    kstep: int,
+    order: int,
+    weighted: bool,
+):
+    """Train an NRL model with BioNEV, or with :mod:`fastnode2vec` for random-walk methods if requested."""
+    if walk_backend == 'fastnode2vec' and method in FASTNODE2VEC_METHODS:
+        return train_embed_fastnode2vec(
+            train_graph_filename=train_graph_filename,
+            method=method,
+            dimensions=dimensions,
+            number_walks=number_walks,
+            walk_length=walk_length,
+            window_size=window_size,
+            p=p,
+            q=q,
+            weighted=weighted,
+        )
+    return embedding_training(
+        train_graph_filename=train_graph_filename,
+        method=method,
+        dimensions=dimensions,
+        number_walks=number_walks,
+        walk_length=walk_length,
+        window_size=window_size,
+        p=p,
+        q=q,
+        alpha=alpha,
+        beta=beta,
+        epochs=epochs,
+        kstep=kstep,
+        order=order,
+        weighted=weighted,
+    )
 
 
 def do_evaluation(
@@ -47,8 +108,13 @@ def do_evaluation(
     classifier_type: Optional[str] = None,
     weighted: bool = False,
     labels_file: Optional[str] = None,
+    walk_backend: str = 'bionev',
 ):
-    """Train and evaluate an NRL model."""
+    """Train and evaluate an NRL model.
+
+    :param walk_backend: either 'bionev' or 'fastnode2vec'. The latter generates the random walks of node2vec and
+     DeepWalk with :mod:`fastnode2vec`, which is much faster.
+    """
     if prediction_task == 'link_prediction':
         node_list = None
         labels = None
@@ -65,7 +131,8 @@ def do_evaluation(
         train_graph_filename = input_path
         graph, graph_train, testing_pos_edges = None, None, None
 
-    model = embedding_training(
+    model = _train_embedding(
+        walk_backend=walk_backend,
         train_graph_filename=train_graph_filename,
         method=method,
         dimensions=dimensions,
@@ -128,7 +195,7 @@ def do_evaluation(
             mcc=mcc,
         )
     if evaluation_file is not None:
-        json.dump(_results, evaluation_file, sort_keys=True, indent=2)
+        evaluation_file.write(json.dumps(_results, sort_keys=True, indent=2))
     return _results
 
 
@@ -148,6 +215,8 @@ def do_optimization(
     classifier_type,
     study_seed,
     weighted: bool = False,
+    n_jobs: int = 1,
+    n_workers: int = 1,
 ):
     """Run optimization a specific method and graph."""
     np.random.seed(study_seed)
@@ -182,6 +251,8 @@ def do_optimization(
             labels=labels,
             classifier_type=classifier_type,
             weighted=weighted,
+            n_jobs=n_jobs,
+            n_workers=n_workers,
             seed=study_seed,
         )
 
@@ -201,6 +272,8 @@ def do_optimization(
             labels=labels,
             classifier_type=classifier_type,
             weighted=weighted,
+            n_jobs=n_jobs,
+            n_workers=n_workers,
         )
 
     elif method == 'node2vec':
@@ -219,6 +292,8 @@ def do_optimization(
             labels=labels,
             classifier_type=classifier_type,
             weighted=weighted,
+            n_jobs=n_jobs,
+            n_workers=n_workers,
         )
 
     elif method == 'GraRep':
@@ -237,6 +312,8 @@ def do_optimization(
             labels=labels,
             classifier_type=classifier_type,
             weighted=weighted,
+            n_jobs=n_jobs,
+            n_workers=n_workers,
         )
 
     elif method == 'SDNE':
@@ -254,6 +331,8 @@ def do_optimization(
             labels=labels,
             classifier_type=classifier_type,
             weighted=weighted,
+            n_jobs=n_jobs,
+            n_workers=n_workers,
         )
 
     else:
@@ -272,10 +351,12 @@ def do_optimization(
             labels=labels,
             classifier_type=classifier_type,
             weighted=weighted,
+            n_jobs=n_jobs,
+            n_workers=n_workers,
         )
 
     study_json = study_to_json(study, prediction_task)
-    json.dump(study_json, output, indent=2, sort_keys=True)
+    output.write(json.dumps(study_json, indent=2, sort_keys=True))
 
 
 def train_model(
@@ -300,14 +381,20 @@ def train_model(
     weighted: bool = False,
     labels_file: Optional[str] = None,
     prediction_task,
+    walk_backend: str = 'bionev',
 ):
-    """Train a graph with an NRL model."""
+    """Train a graph with an NRL model.
+
+    :param walk_backend: either 'bionev' or 'fastnode2vec'. The latter generates the random walks of node2vec and
+     DeepWalk with :mod:`fastnode2vec`, which is much faster.
+    """
     node_list, labels = None, None
     if prediction_task == 'node_classification':
         if not labels_file:
             raise ValueError("No input label file. Exit.")
         node_list, labels = read_node_labels(labels_file)
-    model = embedding_training(
+    model = _train_embedding(
+        walk_backend=walk_backend,
         train_graph_filename=input_path,
         method=method,
         dimensions=dimensions,
@@ -325,7 +412,8 @@ def train_model(
     )
     if training_model_path is not None:
         model.save_model(training_model_path)
-    model.save_embeddings(embeddings_path)
+    if embeddings_path is not None:
+        model.save_embeddings(embeddings_path)
     if weighted:
         original_graph = nx.read_weighted_edgelist(input_path)
     else:
@@ -351,6 +439,59 @@ def train_model(
         )
 
 
+def _call_with_seed(seed: int, function, kwargs):
+    """Seed :mod:`random` and :mod:`numpy.random` then call the function."""
+    np.random.seed(seed)
+    random.seed(seed)
+    return function(**kwargs)
+
+
+def _call_in_temporary_directory(seed: int, function, kwargs):
+    """Call the function like :func:`_call_with_seed`, from a temporary working directory.
+
+    BioNEV writes the training split to ``graph_train.edgelist`` in the working directory and trains from that file,
+    so repeats that run at the same time each need their own working directory.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            return _call_with_seed(seed, function, kwargs)
+        finally:
+            os.chdir(cwd)
+
+
+def _run_repeats(function, kwargs, *, n: int, n_jobs: int, desc: str):
+    """Call the function n times with a different seed each, in parallel processes if n_jobs is not 1."""
+    seeds = [random.randrange(2 ** 32) for _ in range(n)]
+    if n_jobs == 1:
+        return {
+            i: _call_with_seed(seed, function, kwargs)
+            for i, seed in enumerate(tqdm(seeds, desc=desc))
+        }
+
+    # the workers run from temporary directories, so the paths they are given must not be relative
+    kwargs = {
+        key: os.path.abspath(value) if key in PATH_KEYS and isinstance(value, str) else value
+        for key, value in kwargs.items()
+    }
+    # the training is CPU-bound, so use processes. They are spawned rather than forked so they don't inherit the
+    # state of the parent, like the threads of numpy or tensorflow.
+    with ProcessPoolExecutor(
+        max_workers=None if n_jobs == -1 else n_jobs,
+        mp_context=multiprocessing.get_context('spawn'),
+    ) as executor:
+        futures = {
+            executor.submit(_call_in_temporary_directory, seed, function, kwargs): i
+            for i, seed in enumerate(seeds)
+        }
+        all_results = {
+            futures[future]: future.result()
+            for future in tqdm(as_completed(futures), total=n, desc=desc)
+        }
+    return dict(sorted(all_results.items()))
+
+
 def repeat_experiment(
     *,
     input_path,
@@ -374,11 +515,19 @@ def repeat_experiment(
     prediction_task,
     randomization=None,
     classifier_type='LR',
+    n_jobs: int = 1,
 ):
-    """Repeat an experiment several times."""
+    """Repeat an experiment several times.
+
+    Each repeat is run with its own seed, drawn from :mod:`random`, so the results only depend on the state of
+    :mod:`random` and not on the number of processes.
+
+    :param n_jobs: the number of processes to run the repeats in. -1 uses all CPUs.
+    """
     if randomization is None:
-        all_results = {
-            i: do_evaluation(
+        all_results = _run_repeats(
+            do_evaluation,
+            dict(
                 input_path=input_path,
                 training_path=training_path,
                 testing_path=testing_path,
@@ -400,13 +549,16 @@ def repeat_experiment(
                 weighted=weighted,
                 prediction_task=prediction_task,
                 classifier_type=classifier_type,
-            )
-            for i in tqdm(range(n), desc="Repeating experiment")
-        }
+            ),
+            n=n,
+            n_jobs=n_jobs,
+            desc="Repeating experiment",
+        )
     else:
         graph = read_graph(input_path, weighted=weighted)
-        all_results = {
-            i: randomize(
+        all_results = _run_repeats(
+            randomize,
+            dict(
                 randomization_method=randomization,
                 input_graph=graph,
                 method=method,
@@ -422,11 +574,13 @@ def repeat_experiment(
                 kstep=kstep,
                 order=order,
                 weighted=weighted,
-            )
-            for i in tqdm(range(n), desc="Repeating randomization experiment")
-        }
+            ),
+            n=n,
+            n_jobs=n_jobs,
+            desc="Repeating randomization experiment",
+        )
     if evaluation_file is not None:
-        json.dump(all_results, evaluation_file, sort_keys=True, indent=2)
+        evaluation_file.write(json.dumps(all_results, sort_keys=True, indent=2))
     return all_results
 
 
@@ -462,19 +616,14 @@ def randomize(
         random.shuffle(nodes_shuffled)
         relabel = dict(zip(nodes, nodes_shuffled))
         graph_train = nx.relabel_nodes(graph_train, relabel)
-        testing_graph = nx.Graph()
-        testing_graph.add_edges_from(testing_pos_edges)
-        random_graph = nx.compose(graph_train, testing_graph)
-        if weighted:
-            nx.write_weighted_edgelist(graph_train, train_graph_filename)
-        else:
-            nx.write_edgelist(graph_train, train_graph_filename, data=False)
+        random_graph = nx.compose(graph_train, nx.from_edgelist(testing_pos_edges))
+        write_edgelist(graph_train, train_graph_filename, weighted=weighted)
     else:
         return "Randomization method not valid."
     if randomization_method != 'node_shuffle':
         if weighted:
-            for edge in random_graph.edges():
-                random_graph[edge[0]][edge[1]]['weight'] = random.random()
+            weights = {edge: random.random() for edge in random_graph.edges()}
+            nx.set_edge_attributes(random_graph, weights, 'weight')
         relabel = {
             node: str(node)
             for node in random_graph.nodes()
@@ -5,8 +5,9 @@
 import json
 import os
 import random
-from itertools import chain
-from typing import Any, Mapping
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
 
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -22,70 +23,157 @@ from .constants import (
     UNIPROT_NAMESPACE,
 )
 
+#: The name of the training graph edgelist that BioNEV trains from, relative to the working directory
+TRAIN_GRAPH_FILENAME = 'graph_train.edgelist'
+
 
 def study_to_json(study: optuna.Study, prediction_task) -> Mapping[str, Any]:
     """Serialize a study to JSON."""
+    metrics: Tuple[str, ...]
     if prediction_task == 'link_prediction':
-        return {
-            'n_trials': len(study.trials),
-            'name': study.study_name,
-            'id': study.study_id,
-            'prediction_task': prediction_task,
-            'start': study.user_attrs['Date'],
-            'seed': study.user_attrs['Seed'],
-            'best': {
-                'mcc': study.best_trial.user_attrs['mcc'],
-                'accuracy': study.best_trial.user_attrs['accuracy'],
-                'auc_roc': study.best_trial.user_attrs['auc_roc'],
-                'auc_pr': study.best_trial.user_attrs['auc_pr'],
-                'f1': study.best_trial.user_attrs['f1'],
-                'method': study.best_trial.user_attrs['method'],
-                'classifier': study.best_trial.user_attrs['classifier'],
-                'inner_seed': study.best_trial.user_attrs['inner_seed'],
-                'params': study.best_params,
-                'trial': study.best_trial.number,
-                'value': study.best_value,
-            },
-        }
+        metrics = ('mcc', 'accuracy', 'auc_roc', 'auc_pr', 'f1')
     else:
-        return {
-            'n_trials': len(study.trials),
-            'name': study.study_name,
-            'id': study.study_id,
-            'prediction_task': prediction_task,
-            'start': study.user_attrs['Date'],
-            'seed': study.user_attrs['Seed'],
-            'best': {
-                'accuracy': study.best_trial.user_attrs['accuracy'],
-                'micro_f1': study.best_trial.user_attrs['micro_f1'],
-                'macro_f1': study.best_trial.user_attrs['macro_f1'],
-                'method': study.best_trial.user_attrs['method'],
-                'classifier': study.best_trial.user_attrs['classifier'],
-                'inner_seed': study.best_trial.user_attrs['inner_seed'],
-                'params': study.best_params,
-                'trial': study.best_trial.number,
-                'value': study.best_value,
-            },
-        }
+        metrics = ('accuracy', 'micro_f1', 'macro_f1')
 
+    best_trial = study.best_trial
+    user_attrs = best_trial.user_attrs
+    best = {
+        key: user_attrs[key]
+        for key in (*metrics, 'method', 'classifier', 'inner_seed')
+    }
+    best.update(params=best_trial.params, trial=best_trial.number, value=best_trial.value)
+    return {
+        'n_trials': len(study.trials),
+        'name': study.study_name,
+        'id': study.study_id,
+        'prediction_task': prediction_task,
+        'start': study.user_attrs['Date'],
+        'seed': study.user_attrs['Seed'],
+        'best': best,
+    }
 
-def create_graphs(*, input_path, training_path, testing_path, weighted):
-    """Create the training/testing graphs needed for evalution."""
-    input_graph = read_graph(input_path, weighted=weighted)
-    if training_path and testing_path is not None:
-        graph_train, testing_pos_edges, train_graph_filename = train_test_graph(
-            training_path,
-            testing_path,
-            weighted=weighted,
+
+def write_edgelist(graph: nx.Graph, path: str, *, weighted: bool = False, buffering: int = 2 ** 20) -> None:
+    """Write a graph as an edgelist through a large write buffer.
+
+    :param graph: the graph to write
+    :param path: the path of the edgelist file
+    :param weighted: if true, the edge weights are written as a third column. Edges without a weight get none.
+    :param buffering: the size of the write buffer in bytes
+    """
+    if weighted:
+        # like networkx, leave the weight off edges that don't have one
+        lines = (
+            f'{source} {target}\n' if weight is None else f'{source} {target} {weight}\n'
+            for source, target, weight in graph.edges(data='weight')
         )
     else:
-        graph_train, testing_pos_edges, train_graph_filename = split_train_test_graph(
-            input_graph=input_path,
-            weighted=weighted,
-        )
+        lines = (f'{source} {target}\n' for source, target in graph.edges())
+    with open(path, 'w', encoding='utf-8', buffering=buffering) as file:
+        file.writelines(lines)
+
+
+def get_first_smiles(chemicals_mapping: pd.DataFrame) -> Dict[str, str]:
+    """Get the first SMILES listed for each PubChem identifier in a chemicals mapping.
+
+    :param chemicals_mapping: a dataframe with the ``pubchem_id`` and ``smiles`` columns
+    :return: a dictionary from PubChem identifiers to SMILES
+    """
+    return dict(chemicals_mapping.drop_duplicates('pubchem_id')[['pubchem_id', 'smiles']].values)
+
+
+def create_graphs(*, input_path, training_path, testing_path, weighted):
+    """Create the training/testing graphs needed for evalution.
+
+    If the training and testing sets are given, the graphs are only read once and then reused from a cache, so they
+    must not be modified. The training edgelist is still written to the current working directory on every call,
+    since it may not be the one the graphs were first read in, like in the repeats run from temporary directories.
+    Otherwise, the input graph is randomly split on every call.
+    """
+    if training_path and testing_path is not None:
+        input_graph, graph_train, testing_pos_edges = _read_graphs(input_path, training_path, testing_path, weighted)
+        write_edgelist(graph_train, TRAIN_GRAPH_FILENAME, weighted=weighted)
+        return input_graph, graph_train, testing_pos_edges, TRAIN_GRAPH_FILENAME
+
+    input_graph = read_graph(input_path, weighted=weighted)
+    graph_train, testing_pos_edges, train_graph_filename = split_train_test_graph(
+        input_graph=input_path,
+        weighted=weighted,
+    )
     return input_graph, graph_train, testing_pos_edges, train_graph_filename
 
 
+@lru_cache(maxsize=1)
+def _read_graphs(input_path, training_path, testing_path, weighted):
+    input_graph = read_graph(input_path, weighted=weighted)
+    # the file BioNEV writes is left out of the cache, since it's relative to the working directory of this call
+    graph_train, testing_pos_edges, _ = train_test_graph(
+        training_path,
+        testing_path,
+        weighted=weighted,
+    )
+    return input_graph, graph_train, testing_pos_edges
+
+
+@lru_cache(maxsize=2)
+def _load_inverted_graph(path: str) -> pybel.BELGraph:
+    """Load a weighted graph and invert its weights.
+
+    The graph is cached between calls, so it must not be modified.
+    """
+    graph = pybel.from_pickle(path)
+    weights = nx.get_edge_attributes(graph, 'weight')
+    nx.set_edge_attributes(graph, {edge: 1 - weight for edge, weight in weights.items()}, 'weight')
+    return graph
+
+
+@lru_cache(maxsize=2)
+def _load_chemical_names(mapping_path: str) -> Mapping[pybel.dsl.Abundance, pybel.dsl.Abundance]:
+    """Load the relabeling from PubChem identifiers to PubChem names.
+
+    The mapping is cached between calls, so it must not be modified.
+    """
+    mapping_df = pd.read_csv(
+        mapping_path,
+        sep="\t",
+        engine='c',
+        usecols=['namespace', 'identifier', 'name'],
+        dtype={'namespace': 'category', 'identifier': str, 'name': str},
+        index_col=False,
+    )
+    chemicals_df = mapping_df[mapping_df['namespace'] == PUBCHEM_NAMESPACE].dropna(subset=['identifier', 'name'])
+    return {
+        pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=identifier):
+            pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, name=name)
+        for identifier, name in zip(chemicals_df['identifier'].values, chemicals_df['name'].values)
+    }
+
+
+def _all_unweighted_shortest_paths(graph: nx.Graph, *, source, target) -> Iterable[List]:
+    """Generate all the shortest paths between two nodes, ignoring weights.
+
+    Unlike :func:`networkx.all_shortest_paths`, which runs a breadth-first search over the whole component of the
+    source, the distance to the target is first found with a bidirectional search, then the breadth-first search stops
+    at that depth.
+    """
+    distance = len(nx.bidirectional_shortest_path(graph, source, target)) - 1
+    if distance == 0:
+        yield [source]
+        return
+
+    predecessors = nx.predecessor(graph, source, cutoff=distance)
+
+    def _paths_to(node):
+        if node == source:
+            yield [source]
+            return
+        for predecessor in predecessors[node]:
+            for path in _paths_to(predecessor):
+                yield path + [node]
+
+    yield from _paths_to(target)
+
+
 def create_subgraph(  # noqa: C901
     *,
     fullgraph_path,
@@ -100,29 +188,9 @@ def create_subgraph(  # noqa: C901
     common_targets: bool = False,
 ):
     """Create subgraph."""
-    fullgraph = pybel.from_pickle(fullgraph_path)
+    fullgraph = _load_inverted_graph(fullgraph_path)
 
-    # Invert the weights
-    for source, target in fullgraph.edges():
-        for key, edge_data in fullgraph[source][target].items():
-            fullgraph[source][target][key]['weight'] = 1 - edge_data['weight']
-
-    mapping_df = pd.read_csv(
-        mapping_path,
-        sep="\t",
-        dtype={'identifier': str},
-        index_col=False,
-    ).dropna(axis=0, how='any', thresh=None, subset=None, inplace=False)
-    mapping_dict = {}
-    for _, row in mapping_df.iterrows():
-        if row['namespace'] != PUBCHEM_NAMESPACE:
-            continue
-        if row['name'] is None:
-            continue
-
-        _k = pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, identifier=row['identifier'])
-        _v = pybel.dsl.Abundance(namespace=PUBCHEM_NAMESPACE, name=row['name'])
-        mapping_dict[_k] = _v
+    mapping_dict = _load_chemical_names(mapping_path)
 
     source_dsl = RESULTS_TYPE_TO_DSL[source_type]
     source_namespace = RESULTS_TYPE_TO_NAMESPACE[source_type]
@@ -147,15 +215,12 @@ def create_subgraph(  # noqa: C901
         raise KeyError
 
     fullgraph_undirected = fullgraph.to_undirected()
-    paths = [
-        path
-        for path in nx.all_shortest_paths(
-            fullgraph_undirected,
-            source=source,
-            target=target,
-            weight='weight' if weighted else None,
-        )
-    ]
+    if weighted:
+        paths = nx.all_shortest_paths(fullgraph_undirected, source=source, target=target, weight='weight')
+    else:
+        paths = _all_unweighted_shortest_paths(fullgraph_undirected, source=source, target=target)
+    # only pull as many paths from the generator as needed to know if there are more than 100
+    paths = list(islice(paths, 101))
 
     if len(paths) > 100:
         paths = random.sample(paths, 10)